@@ -1,91 +1,355 @@
 import streamlit as st
 import pandas as pd
-import requests
-import urllib.parse
-import time
+import numpy as np
+import asyncio
+import aiohttp
+import cachetools
+import contextlib
+import datetime
+import decimal
+import functools
+import math
+import numbers
 import re
+import threading
+import time
+import xlsxwriter
 from io import BytesIO
+from typing import NamedTuple
+from aiolimiter import AsyncLimiter
+from diskcache import Cache
+
+NAVER_BOOK_API_URL = "https://openapi.naver.com/v1/search/book.json"
+MAX_CONCURRENCY = 8  # 동시에 진행할 최대 API 요청 수
+MAX_RATE = 10  # 초당 최대 API 요청 수 (네이버 QPS 제한 고려)
+MIN_RATE = 1  # 429 응답으로 초당 요청 수를 줄일 때의 하한
+SLOW_DOWN_INTERVAL = 1.0  # 초당 요청 수를 다시 줄이기 전 최소 간격(초)
+SPEED_UP_INTERVAL = 1.0  # 429 응답 없이 이 시간(초)이 지날 때마다 초당 요청 수를 RATE_STEP만큼 늘림
+RATE_STEP = 1  # 초당 요청 수를 MAX_RATE까지 되돌릴 때 한 번에 늘리는 양
+
+# 엑셀 업로드 시 형 추론 없이 문자열로 읽을 열
+TEXT_COLUMNS = ['도서명', '저자', '출판사', 'ISBN', 'ISBN10', 'ISBN13']
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}  # 잠시 후 재시도하면 성공할 수 있는 응답 코드
+RETRY_BACKOFF = 0.3  # 첫 재시도 전 대기 시간(초), 재시도마다 두 배로 증가
+
+DISK_CACHE_DIR = '.isbn_cache'
+DISK_CACHE_SIZE_LIMIT = 256 * 1024 * 1024  # 256MB 초과 시 가장 오래 사용되지 않은 항목부터 제거
+DISK_CACHE_EXPIRE = 30 * 86400  # 30일
+NEGATIVE_CACHE_EXPIRE = 3600  # 검색 결과 없음은 1시간만 저장
+
+MEMORY_CACHE_MAXSIZE = 50_000  # 디스크 캐시 앞단 메모리 캐시 최대 항목 수 (초과 시 LRU 방식으로 제거)
 
 # -----------------------------------------------------------------------------
 # 공통: 네이버 검색 API 사용 함수
 # -----------------------------------------------------------------------------
+_YEAR_RE = re.compile(r'(\d{4})')
+
 def extract_year(pubdate):
     """출간연도에서 첫 번째 4자리 연도만 추출"""
-    if pd.isnull(pubdate):
+    if pubdate is None or pubdate != pubdate:  # None / NaN
         return ''
-    pubdate = str(pubdate).strip()
-    match = re.search(r'\d{4}', pubdate)
+    if isinstance(pubdate, (int, float)) and 1000 <= pubdate <= 9999:
+        # 이미 숫자 연도면 정규식 없이 바로 반환
+        return str(int(pubdate))
+    match = _YEAR_RE.search(str(pubdate).strip())
     if match:
-        return match.group(0)
+        return match.group(1)
     return ''
 
-@st.cache_data
-def get_book_info_by_isbn13(isbn13, max_retries=5):
-    """
-    ISBN13으로 네이버 검색 API에서 정보를 조회하는 함수.
-    반환값 예시:
-      {
-        'title': ...,
-        'author': ...,
-        'publisher': ...,
-        'pubdate': ...,
-        'price': ...,
-        'isbn': ... (10, 13 혼합)
-      }
-    검색 실패 시 None 반환
-    """
-    url = "https://openapi.naver.com/v1/search/book.json"
-    query = isbn13  # ISBN13 기반 검색
-    headers = {
+_BOLD_RE = re.compile(r'</?b>')
+
+def clean_api_text(text):
+    """네이버 API 응답 문자열에서 검색어 강조 태그(<b>, </b>)와 앞뒤 공백 제거"""
+    return _BOLD_RE.sub('', text).strip() if text else ''
+
+def normalize_text(series):
+    """문자열 열 정규화: 결측값은 빈 문자열, 앞뒤 공백 제거"""
+    return series.fillna('').astype(str).str.strip()
+
+def extract_years(series):
+    """extract_year의 벡터화 버전: 열 전체에서 첫 번째 4자리 연도만 추출"""
+    return series.astype(str).str.extract(_YEAR_RE, expand=False).fillna('')
+
+def contains_either(left, right):
+    """두 문자열 열의 같은 행끼리 비교해, 한쪽이 다른 쪽을 포함하면 True"""
+    # Series를 직접 순회하지 않고 NumPy 배열로 꺼내 순회
+    # 짧은 쪽만 긴 쪽에 포함될 수 있으므로 길이를 보고 한 번만 검사
+    pairs = zip(left.to_numpy(dtype=object), right.to_numpy(dtype=object))
+    return pd.Series([(l in r) if len(l) <= len(r) else (r in l) for l, r in pairs], index=left.index, dtype=bool)
+
+_ISBN13_WEIGHTS = np.array([1, 3] * 6 + [1])
+
+def valid_isbn13s(series):
+    """
+    ISBN13 열 전체를 EAN-13 체크섬으로 검증 (0~9 숫자 13자리가 아니면 False).
+    각 자리에 1, 3을 번갈아 곱한 합(검증 숫자 포함)이 10의 배수이면 올바른 ISBN13
+    """
+    valid = series.str.fullmatch(r'[0-9]{13}').astype(bool)
+    # 13자리 숫자 문자열들을 (행 수, 13) 정수 배열로 바꿔 한 번에 계산
+    digits = np.frombuffer(''.join(series[valid]).encode('ascii'), dtype=np.uint8).reshape(-1, 13) - ord('0')
+    valid[valid] = (digits @ _ISBN13_WEIGHTS) % 10 == 0
+    return valid
+
+def read_excel(uploaded_file):
+    """
+    업로드된 엑셀 파일을 DataFrame으로 읽음.
+    Rust 기반 calamine 엔진을 우선 사용하고, 설치되어 있지 않으면 pandas 기본 엔진(openpyxl/xlrd)으로 읽음.
+    TEXT_COLUMNS는 dtype=str로 읽어 형 추론을 생략함 (ISBN이 실수로 바뀌어 '.0'이 붙는 문제도 방지)
+    """
+    dtype = {col: str for col in TEXT_COLUMNS}
+    try:
+        return pd.read_excel(uploaded_file, engine='calamine', dtype=dtype)
+    except ImportError:
+        uploaded_file.seek(0)
+        return pd.read_excel(uploaded_file, dtype=dtype)
+
+_EXCEL_TYPES = (str, numbers.Real, decimal.Decimal, datetime.datetime, datetime.date, datetime.time)
+
+def excel_cell_value(value):
+    """
+    셀 값을 pandas to_excel과 같은 방식으로 xlsxwriter가 기록할 수 있는 값으로 변환.
+    ±inf는 'inf'/'-inf' 문자열, 기간(timedelta)은 일 수, 그 밖에 지원하지 않는 형식은 문자열로 기록
+    """
+    if value is None:
+        return None
+    if isinstance(value, np.bool_):
+        return bool(value)
+    if isinstance(value, numbers.Real) and math.isinf(value):
+        return 'inf' if value > 0 else '-inf'
+    if isinstance(value, datetime.timedelta):
+        # pd.Timedelta도 datetime.timedelta의 하위 클래스
+        return value.total_seconds() / 86400
+    if isinstance(value, _EXCEL_TYPES):
+        return value
+    return str(value)
+
+def to_excel_bytes(df, sheet_name='Sheet1'):
+    """
+    DataFrame을 엑셀(xlsx) 파일 바이트로 변환.
+    xlsxwriter의 constant_memory 모드로 한 행씩 기록하므로 시트가 커도 메모리를 적게 사용함
+    (pandas의 to_excel은 열 단위로 셀을 기록해 constant_memory 모드와 함께 쓸 수 없음)
+    """
+    output = BytesIO()
+    workbook = xlsxwriter.Workbook(output, {
+        'constant_memory': True,
+        'strings_to_urls': False,
+        'default_date_format': 'yyyy-mm-dd',
+    })
+    worksheet = workbook.add_worksheet(sheet_name)
+    worksheet.write_row(0, 0, [str(col) for col in df.columns])
+
+    # 결측값은 빈 셀로 기록
+    values = df.astype(object).where(df.notna(), None)
+    for row_idx, row in enumerate(values.itertuples(index=False, name=None), start=1):
+        worksheet.write_row(row_idx, 0, [excel_cell_value(value) for value in row])
+
+    workbook.close()
+    return output.getvalue()
+
+def get_naver_headers():
+    """네이버 검색 API 인증 헤더"""
+    return {
         'X-Naver-Client-Id': st.secrets["general"]["client_id"],
         'X-Naver-Client-Secret': st.secrets["general"]["client_secret"]
     }
 
-    encoded_query = urllib.parse.quote(query)
-    full_url = f"{url}?query={encoded_query}&display=1"  # 1개 결과만
-    retries = 0
+@st.cache_resource
+def get_disk_cache():
+    """
+    API 조회 결과를 저장하는 디스크 캐시.
+    프로세스 재시작/재배포 후에도 유지되며, 모든 세션이 공유함
+    """
+    cache = Cache(DISK_CACHE_DIR, size_limit=DISK_CACHE_SIZE_LIMIT,
+                  eviction_policy='least-recently-used')
+    cache.stats(enable=True)
+    return cache
+
+def cache_expire(result):
+    """조회 결과의 캐시 유지 시간(초): 검색 결과 없음(빈 값)은 짧게 유지"""
+    return DISK_CACHE_EXPIRE if result else NEGATIVE_CACHE_EXPIRE
+
+@st.cache_resource
+def get_memory_cache():
+    """
+    디스크 캐시 앞단에 두는 프로세스 메모리 LRU 캐시와, 세션(스레드) 간 접근을 보호하는 lock.
+    모든 세션이 공유하며 항목은 cache_expire(결과)초가 지나면 만료됨
+    """
+    cache = cachetools.TLRUCache(
+        maxsize=MEMORY_CACHE_MAXSIZE,
+        ttu=lambda key, result, now: now + cache_expire(result),
+        timer=time.monotonic
+    )
+    return cache, threading.Lock()
+
+def disk_cached(namespace, restore=None):
+    """
+    fetch 코루틴의 결과를 메모리 캐시와 디스크 캐시에 저장하는 데코레이터.
+    메모리 캐시 -> 디스크 캐시 -> API 순으로 조회하며,
+    캐시 키는 (namespace, *조회 인자)이고 session, limiter 인자는 키에서 제외됨.
+    조회 실패(None) 결과는 저장하지 않고, 검색 결과 없음(빈 값)은 NEGATIVE_CACHE_EXPIRE 동안만 저장.
+
+    스트림릿은 실행할 때마다 스크립트를 새 __main__ 모듈로 다시 실행하므로, 스크립트에 정의된
+    클래스(NamedTuple 등)의 인스턴스는 디스크 캐시에 일반 tuple로 저장하고
+    읽을 때 restore(저장된 값)로 되돌림
+    """
+    def decorator(fetch):
+        @functools.wraps(fetch)
+        async def wrapper(session, limiter, *args):
+            memory_cache, lock = get_memory_cache()
+            key = (namespace, *args)
+            with lock:
+                result = memory_cache.get(key)
+            if result is not None:
+                return result
+
+            cache = get_disk_cache()
+            result = cache.get(key)
+            if result is None:
+                result = await fetch(session, limiter, *args)
+                if result is None:
+                    return None
+                stored = tuple(result) if isinstance(result, tuple) else result
+                cache.set(key, stored, expire=cache_expire(result))
+            elif result and restore is not None:
+                result = restore(result)
+
+            with lock:
+                memory_cache[key] = result
+            return result
+        return wrapper
+    return decorator
+
+class RequestLimiter:
+    """
+    네이버 API 요청 제한기 (async with로 사용).
+    동시 요청 수는 세마포어로, 초당 요청 수는 AsyncLimiter(리키 버킷)로 함께 제한하며
+    429 응답을 받으면 slow_down()으로 초당 요청 수를 절반으로 줄이고,
+    이후 429 응답 없이 SPEED_UP_INTERVAL초가 지날 때마다 RATE_STEP씩 max_rate까지 되돌림
+    """
 
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, max_rate=MAX_RATE):
+        self._sem = asyncio.Semaphore(max_concurrency)
+        self._rate_limiter = AsyncLimiter(max_rate, time_period=1)
+        self._max_rate = max_rate
+        self._next_slow_down = 0.0
+        self._next_speed_up = 0.0
+
+    async def __aenter__(self):
+        self._speed_up()
+        await self._sem.acquire()
+        try:
+            await self._rate_limiter.acquire()
+        except BaseException:
+            self._sem.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._sem.release()
+
+    def slow_down(self):
+        """
+        초당 요청 수를 절반으로 (MIN_RATE까지) 줄임.
+        동시에 받은 여러 429 응답으로 연달아 줄지 않도록 SLOW_DOWN_INTERVAL초에 한 번만 줄임
+        """
+        now = time.monotonic()
+        self._next_speed_up = now + SPEED_UP_INTERVAL
+        if now < self._next_slow_down:
+            return
+        self._next_slow_down = now + SLOW_DOWN_INTERVAL
+        self._set_rate(max(MIN_RATE, self._rate_limiter.max_rate / 2))
+
+    def _speed_up(self):
+        """마지막 429 응답 이후 SPEED_UP_INTERVAL초가 지났으면 초당 요청 수를 RATE_STEP만큼 (max_rate까지) 늘림"""
+        if self._rate_limiter.max_rate >= self._max_rate:
+            return
+        now = time.monotonic()
+        if now < self._next_speed_up:
+            return
+        self._next_speed_up = now + SPEED_UP_INTERVAL
+        self._set_rate(min(self._max_rate, self._rate_limiter.max_rate + RATE_STEP))
+
+    def _set_rate(self, max_rate):
+        # 기존 limiter를 그대로 조정해 현재 버킷 수위와 대기 중인 요청을 유지
+        # (AsyncLimiter는 생성 시 계산한 _rate_per_sec로 버킷을 비우므로 함께 갱신.
+        #  비공개 속성이므로 requirements.txt에서 aiolimiter 버전을 고정함)
+        rate_limiter = self._rate_limiter
+        rate_limiter.max_rate = max_rate
+        rate_limiter._rate_per_sec = max_rate / rate_limiter.time_period
+
+async def search_naver_books(session, limiter, query, display, max_retries=5):
+    """
+    네이버 검색 API로 도서를 검색해 items 목록을 반환하는 코루틴.
+    검색 결과가 없으면 빈 리스트, 요청 실패 시 None 반환
+    """
+    retries = 0
     while retries < max_retries:
         try:
-            response = requests.get(full_url, headers=headers)
-            if response.status_code == 200:
-                data = response.json()
-                items = data.get('items', [])
-                if items:
-                    item = items[0]  # 첫 번째 결과만 사용
-                    return {
-                        'title': item.get('title', '').replace('<b>', '').replace('</b>', '').strip(),
-                        'author': item.get('author', '').strip(),
-                        'publisher': item.get('publisher', '').strip(),
-                        'pubdate': item.get('pubdate', '').strip(),
-                        'price': item.get('price', '').strip(),
-                        'isbn': item.get('isbn', '').strip()
-                    }
-                else:
+            async with limiter, session.get(NAVER_BOOK_API_URL, params={'query': query, 'display': display}) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return data.get('items', [])
+                elif response.status == 429:
+                    # Too Many Requests: 이후 요청 속도를 낮춤
+                    limiter.slow_down()
+                elif response.status not in RETRY_STATUSES:
                     return None
-            elif response.status_code == 429:
-                # Too Many Requests
-                time.sleep(1)
-                retries += 1
-            else:
-                return None
-        except requests.exceptions.RequestException:
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            # 연결 끊김/시간 초과도 일시적 오류로 보고 재시도
+            pass
+        except (aiohttp.ClientError, ValueError):
+            # ValueError: 응답 본문이 올바른 JSON이 아닌 경우 (json.JSONDecodeError)
             return None
-    
+
+        # 일시적 오류(429, 5xx 등): 요청 제한기를 반납한 상태에서 지수적으로 늘어나는 시간만큼 대기 후 재시도
+        retries += 1
+        if retries < max_retries:
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** (retries - 1))
+
     return None
 
+class BookInfo(NamedTuple):
+    """네이버 검색 API의 도서 정보 (isbn은 ISBN10, ISBN13 혼합)"""
+    title: str
+    author: str
+    publisher: str
+    pubdate: str
+    price: str
+    isbn: str
+
+EMPTY_BOOK_INFO = BookInfo('', '', '', '', '', '')
 
-def get_isbn13_from_title_author_pub(title, author, publisher, pub_year, max_retries=5):
+@disk_cached('book_info_v2', restore=lambda values: BookInfo(*values))
+async def fetch_book_info(session, limiter, isbn13):
     """
-    도서명, 저자, 출판사, 출간연도 정보를 활용해 네이버 검색 API로부터 ISBN13을 추출.
-    기존 코드(기능1) 로직을 기반으로 함.
+    ISBN13으로 네이버 검색 API에서 정보를 조회해 BookInfo로 반환하는 코루틴.
+    검색 결과가 없으면 빈 문자열, 요청 실패 시 None 반환
     """
-    url = "https://openapi.naver.com/v1/search/book.json"
-    headers = {
-        'X-Naver-Client-Id': st.secrets["general"]["client_id"],
-        'X-Naver-Client-Secret': st.secrets["general"]["client_secret"]
-    }
+    items = await search_naver_books(session, limiter, isbn13, display=1)  # 1개 결과만
+    if items is None:
+        return None
+    if not items:
+        return ''
+
+    item = items[0]  # 첫 번째 결과만 사용
+    return BookInfo(
+        title=clean_api_text(item.get('title', '')),
+        author=item.get('author', '').strip(),
+        publisher=item.get('publisher', '').strip(),
+        pubdate=item.get('pubdate', '').strip(),
+        price=item.get('price', '').strip(),
+        isbn=item.get('isbn', '').strip()
+    )
+
 
+@disk_cached('isbn13')
+async def fetch_isbn13(session, limiter, title, author, publisher, pub_year):
+    """
+    도서명, 저자, 출판사, 출간연도 정보를 활용해 네이버 검색 API로부터 ISBN13을 추출하는 코루틴.
+    기존 코드(기능1) 로직을 기반으로 함.
+    검색 결과가 없으면 빈 문자열, 요청 실패 시 None 반환
+    """
     # 검색 쿼리 조합 (우선순위)
     query_combinations = [
         f"{title} {author} {publisher} {pub_year}",
@@ -95,68 +359,166 @@ def get_isbn13_from_title_author_pub(title, author, publisher, pub_year, max_ret
     ]
 
     for query in query_combinations:
-        encoded_query = urllib.parse.quote(query)
-        full_url = f"{url}?query={encoded_query}&display=5"
-        
-        retries = 0
-        while retries < max_retries:
-            try:
-                response = requests.get(full_url, headers=headers)
-                if response.status_code == 200:
-                    data = response.json()
-                    items = data.get('items', [])
-                    if items:
-                        # 우선순위 쿼리에서 일치 항목 찾기
-                        for item in items:
-                            item_title = item.get('title', '').replace('<b>', '').replace('</b>', '').strip().lower()
-                            item_author = item.get('author', '').strip().lower()
-                            item_publisher = item.get('publisher', '').strip().lower()
-                            item_pub_year = extract_year(item.get('pubdate', '').strip())
-                            
-                            # 모두 소문자로 변환해 비교
-                            if (title.lower() in item_title) \
-                               and (author.lower() in item_author) \
-                               and (publisher.lower() in item_publisher) \
-                               and (pub_year == item_pub_year):
-                                # ISBN 추출
-                                isbn_full = item.get('isbn', '')
-                                isbn13 = extract_isbn13(isbn_full)
-                                if isbn13:
-                                    return isbn13
-                        # 일치 항목 없으면, 첫 번째 결과의 ISBN 반환
-                        first_item = items[0]
-                        isbn_full = first_item.get('isbn', '')
-                        isbn13 = extract_isbn13(isbn_full)
-                        return isbn13
-                    else:
-                        # 검색 결과 없음
-                        break
-                elif response.status_code == 429:
-                    time.sleep(1)
-                    retries += 1
-                else:
-                    return None
-            except requests.exceptions.RequestException:
-                return None
+        items = await search_naver_books(session, limiter, query, display=5)
+        if items is None:
+            return None
+        if items:
+            # 결과가 나온 첫 쿼리에서 멈추고, 그 결과 중 가장 잘 일치하는 항목 선택
+            # (검색 결과가 없을 때만 더 넓은 쿼리로 넘어감)
+            return best_match_isbn13(items, title, author, publisher, pub_year)
 
-    return None
+    return ''
+
+def best_match_isbn13(items, title, author, publisher, pub_year):
+    """
+    검색 결과 중 도서명/저자/출판사/출간연도가 가장 많이 일치하는 항목의 ISBN13 반환.
+    점수가 같으면 검색 결과 순서상 앞선 항목을 선택하며, ISBN13이 있는 항목이 없으면 빈 문자열 반환
+    """
+    # 모두 소문자로 변환해 비교
+    title, author, publisher = title.lower(), author.lower(), publisher.lower()
+
+    best_isbn13, best_score = '', -1
+    for item in items:
+        isbn13 = extract_isbn13(item.get('isbn', ''))
+        if not isbn13:
+            continue
+
+        score = (
+            (title in clean_api_text(item.get('title', '')).lower())
+            + (author in item.get('author', '').strip().lower())
+            + (publisher in item.get('publisher', '').strip().lower())
+            + (pub_year == extract_year(item.get('pubdate', '').strip()))
+        )
+        if score > best_score:
+            best_isbn13, best_score = isbn13, score
+            if score == 4:
+                # 모든 항목 일치
+                break
+
+    return best_isbn13
+
+@contextlib.asynccontextmanager
+async def naver_session():
+    """
+    네이버 API 호출에 공유할 (session, limiter) 생성.
+    limiter는 한 번의 실행(asyncio.run) 안에서만 사용하는 RequestLimiter
+    세션의 커넥션 풀이 keep-alive 연결을 재사용하므로 요청마다 TCP/TLS 연결을 새로 맺지 않음
+    """
+    limiter = RequestLimiter()
+    connector = aiohttp.TCPConnector(limit=10)
+    async with aiohttp.ClientSession(headers=get_naver_headers(), connector=connector) as session:
+        yield session, limiter
+
+class BatchFetcher:
+    """
+    조회 요청을 모아 배치 단위로 보내는 조회기.
+    submit()으로 받은 요청이 max_batch_size개 모이거나 batch_interval초가 지나면
+    (기본값 0: 같은 이벤트 루프 단계에서 들어온 요청끼리 지연 없이 묶음)
+    공유 세션에서 한꺼번에 동시에 실행하고, 결과를 각 요청의 Future에 채워줌.
+    아직 보내지 않은 배치 안의 중복 요청은 하나의 Future를 공유함
+    """
+
+    def __init__(self, session, limiter, fetch, max_batch_size=10, batch_interval=0):
+        self.session = session
+        self.limiter = limiter
+        self.fetch = fetch
+        self.max_batch_size = max_batch_size
+        self.batch_interval = batch_interval
+        self._pending = {}  # 조회 인자 튜플 -> Future
+        self._flush_handle = None
+        self._tasks = set()  # 실행 중인 배치 (가비지 컬렉션 방지용 참조)
+
+    def submit(self, key):
+        """조회 요청(fetch에 넘길 인자 튜플)을 배치에 추가하고, 결과를 받을 Future를 반환"""
+        if key in self._pending:
+            return self._pending[key]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[key] = future
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_interval, self._flush)
+        return future
+
+    async def aclose(self):
+        """
+        보내지 않은 요청과 실행 중인 배치를 모두 취소하고 끝날 때까지 기다림.
+        세션을 닫기 전에 호출해야 닫힌 세션을 쓰는 배치가 남지 않음
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for future in self._pending.values():
+            future.cancel()
+        self._pending = {}
+
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, {}
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        results = await asyncio.gather(
+            *(self.fetch(self.session, self.limiter, *key) for key in batch),
+            return_exceptions=True
+        )
+        for future, result in zip(batch.values(), results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+async def _gather_naver(fetch, keys):
+    """
+    하나의 세션을 공유하며 keys 각각에 대해 fetch(session, limiter, *key)를 BatchFetcher로 동시에 실행.
+    모든 요청이 끝날 때까지 기다린 뒤, 실패한 요청이 있으면 첫 번째 예외를 다시 발생시킴
+    """
+    async with naver_session() as (session, limiter):
+        fetcher = BatchFetcher(session, limiter, fetch)
+        try:
+            results = await asyncio.gather(*(fetcher.submit(key) for key in keys), return_exceptions=True)
+        finally:
+            await fetcher.aclose()
+
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+def fetch_all(fetch, keys):
+    """
+    fetch 코루틴을 keys(인자 튜플 목록) 전체에 대해 동시에 실행하고, keys 순서대로 결과 리스트를 반환.
+    동시 요청 수는 MAX_CONCURRENCY, 초당 요청 수는 MAX_RATE로 제한됨
+    """
+    return asyncio.run(_gather_naver(fetch, keys))
+
+_ISBN13_RE = re.compile(r'\b97[89]\d{10}\b')
 
 def extract_isbn13(isbn_str):
     """
     네이버 API 반환값 isbn_str은
     'ISBN10 ISBN13' 형식일 수도 있고, 하나만 올 수도 있음.
-    이 중에서 ISBN13만 추출해서 반환.
+    이 중에서 ISBN13(규격상 978 혹은 979로 시작하는 13자리 숫자)만 추출해서 반환.
     """
     if not isbn_str:
         return None
-    
-    # 공백으로 구분되어 있다면 ISBN10 / ISBN13 구조일 확률이 높음
-    parts = isbn_str.split()
-    for p in parts:
-        # 길이가 13자리이며, 숫자인지 확인
-        # ISBN13은 978 혹은 979로 시작할 가능성이 큼 (규격상)
-        if len(p) == 13 and p.isdigit():
-            return p
+
+    match = _ISBN13_RE.search(isbn_str)
+    if match:
+        return match.group(0)
     return None
 
 # -----------------------------------------------------------------------------
@@ -167,7 +529,7 @@ def run_feature_1():
 
     uploaded_file = st.file_uploader("엑셀 파일 업로드", type=["xlsx", "xls"])
     if uploaded_file is not None:
-        df = pd.read_excel(uploaded_file)
+        df = read_excel(uploaded_file)
 
         # 예시: 엑셀에 '도서명', '저자', '출판사', '출간연도', 'ISBN' 열이 있다고 가정
         required_columns = ['도서명', '저자', '출판사', '출간연도', 'ISBN']
@@ -176,40 +538,29 @@ def run_feature_1():
                 st.error(f"필수 열이 누락되었습니다: {col}")
                 return
         
-        # ISBN을 ISBN13으로 업데이트
-        isbn_cache = {}
-        for idx, row in df.iterrows():
-            title = str(row['도서명']).strip() if not pd.isnull(row['도서명']) else ''
-            author = str(row['저자']).strip() if not pd.isnull(row['저자']) else ''
-            publisher = str(row['출판사']).strip() if not pd.isnull(row['출판사']) else ''
-            year = extract_year(row['출간연도'])
-            
-            if not title:
-                # 도서명 없으면 스킵
-                df.at[idx, 'ISBN'] = '도서명 없음'
-                continue
-
-            cache_key = (title, author, publisher, year)
-            if cache_key in isbn_cache:
-                isbn13 = isbn_cache[cache_key]
-            else:
-                isbn13 = get_isbn13_from_title_author_pub(title, author, publisher, year)
-                isbn_cache[cache_key] = isbn13
-            
-            if isbn13:
-                df.at[idx, 'ISBN'] = isbn13
-            else:
-                df.at[idx, 'ISBN'] = '정보 없음'
-
-            time.sleep(0.2)  # API 호출 사이 딜레이
+        # 행별 검색 키 (결측값은 빈 문자열)
+        keys = pd.DataFrame({
+            'title': normalize_text(df['도서명']),
+            'author': normalize_text(df['저자']),
+            'publisher': normalize_text(df['출판사']),
+            'year': extract_years(df['출간연도']),
+        }, index=df.index)
+
+        # 중복을 먼저 제거하고, 고유한 키마다 한 번씩만 동시에 조회 (도서명 없는 행 제외)
+        unique_keys = list(keys[keys['title'] != ''].drop_duplicates().itertuples(index=False, name=None))
+        isbn13_by_key = dict(zip(unique_keys, fetch_all(fetch_isbn13, unique_keys)))
+
+        # ISBN을 ISBN13으로 업데이트 (도서명 없으면 스킵): 결과를 리스트로 모아 열 전체를 한 번에 할당
+        df['ISBN'] = [
+            (isbn13_by_key.get(key) or '정보 없음') if key[0] else '도서명 없음'
+            for key in keys.itertuples(index=False, name=None)
+        ]
 
         # 변환된 결과 다운로드 버튼
         st.success("변환이 완료되었습니다. 아래 버튼을 눌러 다운로드하세요.")
-        output = BytesIO()
-        df.to_excel(output, index=False)
         st.download_button(
             label="ISBN 변환 결과 다운로드",
-            data=output.getvalue(),
+            data=to_excel_bytes(df),
             file_name="도서목록_업데이트.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
@@ -223,7 +574,7 @@ def run_feature_2():
 
     uploaded_file = st.file_uploader("검증을 위한 엑셀 파일 업로드", type=["xlsx", "xls"])
     if uploaded_file is not None:
-        df = pd.read_excel(uploaded_file)
+        df = read_excel(uploaded_file)
 
         # 예시: 'ISBN10', 'ISBN13', '도서명', '출간일', '출판사', '저자', '정가' 열이 있다고 가정
         # 실제 엑셀 파일에 맞추어 수정하세요.
@@ -233,77 +584,58 @@ def run_feature_2():
                 st.error(f"필수 열이 누락되었습니다: {col}")
                 return
 
-        # 비교 결과를 저장할 컬럼들 추가
-        df['일치여부'] = ''
-        df['불일치_항목'] = ''
-
-        for idx, row in df.iterrows():
-            original_isbn10 = str(row['ISBN10']).strip() if not pd.isnull(row['ISBN10']) else ''
-            original_isbn13 = str(row['ISBN13']).strip() if not pd.isnull(row['ISBN13']) else ''
-            original_title = str(row['도서명']).strip() if not pd.isnull(row['도서명']) else ''
-            original_author = str(row['저자']).strip() if not pd.isnull(row['저자']) else ''
-            original_publisher = str(row['출판사']).strip() if not pd.isnull(row['출판사']) else ''
-            original_price = str(row['정가']).strip() if not pd.isnull(row['정가']) else ''
-            original_pubdate = str(row['출간일']).strip() if not pd.isnull(row['출간일']) else ''
-
-            # ISBN13으로 정보 검색
-            if not original_isbn13 or len(original_isbn13) < 13:
-                df.at[idx, '일치여부'] = '검색 불가(ISBN13 없음)'
-                df.at[idx, '불일치_항목'] = 'ISBN13 미입력'
-                continue
-
-            # API 조회
-            book_info = get_book_info_by_isbn13(original_isbn13)
-            time.sleep(0.2)
+        # 원본 정보 정규화
+        original = pd.DataFrame({col: normalize_text(df[col]) for col in ['ISBN13', '도서명', '저자', '출판사', '정가', '출간일']})
+        isbn13s = original['ISBN13'].str.replace('-', '', regex=False)
+        missing = isbn13s.str.len() < 13
+        # 체크섬이 맞지 않는 ISBN13은 API를 호출하지 않음
+        searchable = valid_isbn13s(isbn13s)
+
+        # 고유한 ISBN13마다 한 번씩만 동시에 조회
+        unique_isbns = isbn13s[searchable].unique().tolist()
+        book_infos = dict(zip(unique_isbns, fetch_all(fetch_book_info, [(isbn13,) for isbn13 in unique_isbns])))
+        found = isbn13s.isin([isbn13 for isbn13, book_info in book_infos.items() if book_info])
+
+        # Naver API 결과를 행 단위로 펼침 (검색 결과 없는 행은 빈 문자열)
+        api = pd.DataFrame(
+            [book_infos.get(isbn13) or EMPTY_BOOK_INFO for isbn13 in isbn13s],
+            index=df.index, columns=BookInfo._fields
+        )
 
-            if not book_info:
-                # 검색 결과 없음
-                df.at[idx, '일치여부'] = '검색 실패'
-                df.at[idx, '불일치_항목'] = '검색 결과 없음'
-                continue
-            
-            # Naver API 결과 추출
-            api_title = book_info['title'].lower()
-            api_author = book_info['author'].lower()
-            api_publisher = book_info['publisher'].lower()
-            api_price = book_info['price']
-            api_pubdate = extract_year(book_info['pubdate'])
-
-            # 비교할 원본 정보 소문자 변환
-            o_title = original_title.lower()
-            o_author = original_author.lower()
-            o_publisher = original_publisher.lower()
-            o_price = original_price  # 가격은 소문자 변환 불필요
-            o_pubdate = extract_year(original_pubdate)
-
-            # 각 항목 비교
-            mismatch_list = []
-            if o_title and (o_title not in api_title and api_title not in o_title):
-                mismatch_list.append('도서명')
-            if o_author and (o_author not in api_author and api_author not in o_author):
-                mismatch_list.append('저자')
-            if o_publisher and (o_publisher not in api_publisher and api_publisher not in o_publisher):
-                mismatch_list.append('출판사')
-            # 출간일(연도) 비교
-            if o_pubdate and (o_pubdate != api_pubdate):
-                mismatch_list.append('출간연도')
-            # 정가 비교(문자열로 단순 비교)
-            if o_price and (o_price != api_price):
-                mismatch_list.append('정가')
-
-            if len(mismatch_list) == 0:
-                df.at[idx, '일치여부'] = '일치'
-            else:
-                df.at[idx, '일치여부'] = '불일치'
-                df.at[idx, '불일치_항목'] = ','.join(mismatch_list)
+        # 비교할 정보 소문자 변환 (가격은 소문자 변환 불필요)
+        o_title, api_title = original['도서명'].str.lower(), api['title'].str.lower()
+        o_author, api_author = original['저자'].str.lower(), api['author'].str.lower()
+        o_publisher, api_publisher = original['출판사'].str.lower(), api['publisher'].str.lower()
+        o_pubdate, api_pubdate = extract_years(original['출간일']), extract_years(api['pubdate'])
+        o_price = original['정가']
+
+        # 각 항목 비교 (출간일은 연도, 정가는 문자열로 단순 비교)
+        mismatches = pd.DataFrame({
+            '도서명': (o_title != '') & ~contains_either(o_title, api_title),
+            '저자': (o_author != '') & ~contains_either(o_author, api_author),
+            '출판사': (o_publisher != '') & ~contains_either(o_publisher, api_publisher),
+            '출간연도': (o_pubdate != '') & (o_pubdate != api_pubdate),
+            '정가': (o_price != '') & (o_price != api['price']),
+        })
+        mismatch_items = mismatches.dot(mismatches.columns + ',').str.rstrip(',')
+
+        # 비교 결과 컬럼 추가
+        df['일치여부'] = np.select(
+            [missing, ~searchable, ~found, mismatches.any(axis=1)],
+            ['검색 불가(ISBN13 없음)', '검색 불가(ISBN13 형식 오류)', '검색 실패', '불일치'],
+            default='일치'
+        )
+        df['불일치_항목'] = np.select(
+            [missing, ~searchable, ~found],
+            ['ISBN13 미입력', 'ISBN13 형식 오류', '검색 결과 없음'],
+            default=mismatch_items
+        )
 
         # 결과 다운로드
         st.success("비교가 완료되었습니다. 아래 버튼을 눌러 결과 파일을 다운로드하세요.")
-        output = BytesIO()
-        df.to_excel(output, index=False)
         st.download_button(
             label="비교 결과 다운로드",
-            data=output.getvalue(),
+            data=to_excel_bytes(df),
             file_name="도서목록_비교결과.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
@@ -324,5 +656,13 @@ def main():
     with tab2:
         run_feature_2()
 
+    # 디스크 캐시 현황
+    cache = get_disk_cache()
+    hits, misses = cache.stats()
+    st.sidebar.subheader("캐시 현황")
+    st.sidebar.write(f"디스크 캐시: 항목 {len(cache)}개, 적중 {hits}회, 미적중 {misses}회")
+    memory_cache, _ = get_memory_cache()
+    st.sidebar.write(f"메모리 캐시: 항목 {memory_cache.currsize}개 / 최대 {memory_cache.maxsize}개")
+
 if __name__ == "__main__":
     main()